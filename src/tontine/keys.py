@@ -1,7 +1,54 @@
+import asyncio
 import dataclasses
+import json
+import math
+import os
 import pathlib
+import secrets
+import struct
 import subprocess
-from typing import Dict, List, Optional
+import tempfile
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import tontine.process
+
+# Chunked ciphertext containers start with these bytes. The layout of a container is:
+#
+#   CHUNKED_MAGIC
+#   Encrypted chunks, in any order
+#   Chain-encrypted JSON header holding the data key and the offset and length of each chunk
+#   Offset of the header, as an 8-byte big-endian integer
+#
+# Each chunk is a gpg symmetric message (AES256 with an MDC) whose passphrase is the data key combined with the chunk
+# number, so chunks can be decrypted independently but cannot be reordered.
+CHUNKED_MAGIC = b"TONTINE-CHUNKED-1\n"
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+_HEADER_OFFSET = struct.Struct(">Q")
+
+# Flag in the reason field of a gpg IMPORT_OK status line indicating that a secret key was imported.
+_IMPORT_OK_SECRET = 16
+
+
+def _check_recipients(key_fingerprints: List[str]):
+    if len(key_fingerprints) <= 1:
+        raise ValueError(f"At least two keys must be used for encryption. Received {key_fingerprints}.")
+    if len(set(key_fingerprints)) != len(key_fingerprints):
+        raise ValueError(f"Each key may only be used once for encryption. Received {key_fingerprints}.")
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    """Write all of `data` to `fd` at `offset`, retrying short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def is_chunked(path: pathlib.Path) -> bool:
+    """Check whether `path` is a chunked ciphertext container written by `chunked_encrypt`."""
+    with path.open("rb") as f:
+        return f.read(len(CHUNKED_MAGIC)) == CHUNKED_MAGIC
 
 
 @dataclasses.dataclass
@@ -11,22 +58,63 @@ class Key:
     subkeys: Dict[str, str]
 
 
-class Keyring:
-    def __init__(self, location: pathlib.Path, gpg_exe: str = "gpg"):
+class _KeyIndex:
+    def __init__(self, keys: List[Key], stamp: Optional[Tuple[int, int, int]]):
         """
-        Initialise a new keyring object.
+        In-memory index of the keys in a keyring.
 
-        A Keyring object is a limited interface to the `gpg` executable. It provides the methods required to
-        sequentially encrypt or decrypt a file.
+        Args:
+            keys: Keys in the keyring.
+            stamp: Identifies the state of the keyring on disk when `keys` were listed, so that changes made by other
+                processes can be detected.
+        """
+        # Map of fingerprint to key, in keyring order.
+        self.keys: Dict[str, Key] = {}
+
+        # Map of fingerprint, key ID, subkey fingerprint and subkey ID to key.
+        self.ids: Dict[str, Key] = {}
+
+        # Fingerprints of keys imported since they were listed, to be listed together on the next lookup.
+        self.stale: Set[str] = set()
+
+        self.stamp = stamp
+        self.update(keys)
+
+    def update(self, keys: List[Key]):
+        for key in keys:
+            self.keys[key.fingerprint] = key
+            for key_id in [key.fingerprint, key.fingerprint[-16:], *key.subkeys, *key.subkeys.values()]:
+                self.ids[key_id] = key
 
-        This interface always passes `--homedir` to `gpg`, so it won't touch existing keys on a system.
+
+class AsyncKeyring:
+    def __init__(
+            self,
+            location: pathlib.Path,
+            gpg_exe: str = "gpg",
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ):
+        """
+        Initialise a new asynchronous keyring object.
+
+        This provides the same interface as `Keyring`, but runs `gpg` using asyncio so that many operations can be in
+        flight at once without a thread per operation. Cancelling an operation kills the `gpg` processes it started.
 
         Args:
             location: Location of the GPG home directory used for storing keypairs.
             gpg_exe: GPG executable location.
+            max_concurrency: Maximum number of gpg commands that may run at once. `None` means no limit.
+            timeout: Timeout in seconds for each gpg command. Methods such as `chain_decrypt` run several commands in
+                turn, so may take longer than this in total. `None` means no timeout.
         """
         self.location = location
         self._gpg_exe = gpg_exe
+        self._runner = tontine.process.ProcessRunner(max_concurrency, timeout)
+
+        # Indexes of public (False) and secret (True) keys. These are loaded from a single listing on first use and
+        # updated as keys are imported, and are only listed again if another process changes the keyring.
+        self._indexes: Dict[bool, _KeyIndex] = {}
 
         if self.location.exists():
             if not self.location.is_dir():
@@ -39,32 +127,101 @@ class Keyring:
     def gpg(self):
         return [self._gpg_exe, "--homedir", str(self.location)]
 
-    def import_key(self, key_file: pathlib.Path) -> None:
+    async def import_key(self, key_file: pathlib.Path) -> List[str]:
         """
         Import public or private keys into the keyring.
 
         Args:
             key_file: Location of the key file (public or private) to import.
+
+        Returns:
+            Fingerprints of the keys contained in `key_file`, in the order they appear in the file.
+        """
+        stamps = {secret: self._stamp(secret) for secret in (False, True)}
+        stdout = await self._runner.run(self.gpg + ["--status-fd", "1", "--import", str(key_file)])
+
+        # Map of fingerprint to the combined IMPORT_OK flags for that key.
+        imported: Dict[str, int] = {}
+        for ln in stdout.decode().split("\n"):
+            cpts = ln.split()
+            if cpts[:2] == ["[GNUPG:]", "IMPORT_OK"]:
+                imported[cpts[3]] = imported.get(cpts[3], 0) | int(cpts[2])
+
+        for secret, index in list(self._indexes.items()):
+            # If someone else changed the keyring before this import, the index must be rebuilt from scratch.
+            if index.stamp != stamps[secret]:
+                del self._indexes[secret]
+                continue
+
+            if secret:
+                changed = [f for f, flags in imported.items() if flags & _IMPORT_OK_SECRET]
+            else:
+                changed = [f for f, flags in imported.items() if flags or f not in index.keys]
+
+            if changed:
+                index.stamp = self._stamp(secret)
+                index.stale.update(changed)
+
+        return list(imported)
+
+    async def get_key(self, key_id: str, secret: bool = False) -> Key:
         """
-        subprocess.run(self.gpg + ["--import", str(key_file)], check=True)
+        Look up a key by its fingerprint, key ID, or the fingerprint or ID of one of its subkeys.
 
-    def list_public_keys(self) -> List[Key]:
-        """Get list of all public keys in keyring."""
-        rval = subprocess.run(
-            self.gpg + ["--list-keys", "--with-colons"],
-            stdout=subprocess.PIPE, check=True, text=True
-        )
-        return self._parse_list_keys_stdout(rval.stdout)
+        Raises a `KeyError` if no such key is in the keyring.
 
-    def list_secret_keys(self) -> List[Key]:
+        Args:
+            key_id: Fingerprint or ID of the key or one of its subkeys.
+            secret: Look up secret keys instead of public keys.
+        """
+        index = await self._index(secret)
+        try:
+            return index.ids[key_id.upper()]
+        except KeyError:
+            raise KeyError(f"No {'secret' if secret else 'public'} key {key_id} in keyring.") from None
+
+    async def list_public_keys(self) -> List[Key]:
         """Get list of all public keys in keyring."""
-        rval = subprocess.run(
-            self.gpg + ["--list-secret-keys", "--with-colons"],
-            stdout=subprocess.PIPE, check=True, text=True
-        )
-        return self._parse_list_keys_stdout(rval.stdout)
+        return list((await self._index(False)).keys.values())
 
-    def chain_decrypt(self, file_to_decrypt: pathlib.Path) -> str:
+    async def list_secret_keys(self) -> List[Key]:
+        """Get list of all secret keys in keyring."""
+        return list((await self._index(True)).keys.values())
+
+    def _stamp(self, secret: bool) -> Optional[Tuple[int, int, int]]:
+        """Identify the current state of the public or secret keyring on disk."""
+        try:
+            st = (self.location / ("private-keys-v1.d" if secret else "pubring.kbx")).stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    async def _index(self, secret: bool) -> _KeyIndex:
+        """
+        Get the index of public or secret keys.
+
+        The whole keyring is listed if it has changed since the index was built. Otherwise, only keys imported by this
+        object since the last lookup are listed, in a single call.
+        """
+        stamp = self._stamp(secret)
+        index = self._indexes.get(secret)
+        if index is None or index.stamp != stamp:
+            index = _KeyIndex(await self._list_keys(secret), stamp)
+            self._indexes[secret] = index
+        elif index.stale:
+            stale = sorted(index.stale)
+            index.update(await self._list_keys(secret, stale))
+            index.stale.difference_update(stale)
+
+        return index
+
+    async def _list_keys(self, secret: bool, fingerprints: Sequence[str] = ()) -> List[Key]:
+        """List public or secret keys, restricted to `fingerprints` if any are given."""
+        option = "--list-secret-keys" if secret else "--list-keys"
+        stdout = await self._runner.run(self.gpg + [option, "--with-colons"] + list(fingerprints))
+        return self._parse_list_keys_stdout(stdout.decode())
+
+    async def chain_decrypt(self, file_to_decrypt: pathlib.Path) -> str:
         """
         Repeatedly decrypt file until a cleartext message is returned.
 
@@ -80,38 +237,24 @@ class Keyring:
         # decryption attempt.
 
         # If it takes more tries to decrypt the file than we have secret keys, we abort.
-        secret_keys = self.list_secret_keys()
+        secret_keys = await self.list_secret_keys()
 
         # Decrypt once and save results into memory
-        p = subprocess.run(
-            self.gpg + ["--decrypt", "--output", "-", str(file_to_decrypt)],
-            stdout=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-        decrypted = p.stdout
+        decrypted = await self._runner.run(self.gpg + ["--decrypt", "--output", "-", str(file_to_decrypt)])
 
-        message_header = "-----BEGIN PGP MESSAGE----"
+        message_header = b"-----BEGIN PGP MESSAGE----"
 
         num_attempts = 1
         while num_attempts < len(secret_keys) and message_header in decrypted:
             num_attempts += 1
-
-            p = subprocess.run(
-                self.gpg + ["--decrypt", "--output", "-", "-"],
-                text=True,
-                check=True,
-                stdout=subprocess.PIPE,
-                input=decrypted,
-            )
-            decrypted = p.stdout
+            decrypted = await self._runner.run(self.gpg + ["--decrypt", "--output", "-", "-"], input=decrypted)
 
         if message_header in decrypted:
             raise ValueError(f"Unable to decrypt message after {num_attempts} tries.")
 
-        return decrypted
+        return decrypted.decode()
 
-    def chain_encrypt(self, file_to_encrypt: pathlib.Path, key_fingerprints: List[str], outfile: pathlib.Path):
+    async def chain_encrypt(self, file_to_encrypt: pathlib.Path, key_fingerprints: List[str], outfile: pathlib.Path):
         """
         Repeatedly encrypt a file using the public keys given by `key_fingerprints`.
 
@@ -120,38 +263,237 @@ class Keyring:
             key_fingerprints: List of public key fingerprints.
             outfile: Ciphertext file location.
         """
-        if len(key_fingerprints) <= 1:
-            raise ValueError(f"At least two keys must be used for encryption. Received {key_fingerprints}.")
+        _check_recipients(key_fingerprints)
 
         extra_args = ["--encrypt", "--armor", "--trust-model", "always", "--yes"]
-        executables = []
-        with file_to_encrypt.open("rb") as enc_in:
-            p = subprocess.Popen(
-                self.gpg + extra_args + ["--recipient", key_fingerprints[0], "--output", "-", str(file_to_encrypt)],
-                stdout=subprocess.PIPE,
-                stdin=enc_in
+        cmds = []
+        for i, recipient in enumerate(key_fingerprints):
+            infile = str(file_to_encrypt) if i == 0 else "-"
+            output = str(outfile) if i == len(key_fingerprints) - 1 else "-"
+            cmds.append(self.gpg + extra_args + ["--recipient", recipient, "--output", output, infile])
+
+        # Each gpg process writes into a pipe that is read by the next one, so the intermediate ciphertexts are never
+        # held in memory.
+        async with self._runner.slot():
+            executables: List[asyncio.subprocess.Process] = []
+            async with self._runner.reap(executables):
+                stdin: Optional[int] = subprocess.DEVNULL
+                for cmd in cmds:
+                    read_fd, write_fd = os.pipe() if cmd is not cmds[-1] else (None, None)
+                    try:
+                        p = await asyncio.create_subprocess_exec(*cmd, stdin=stdin, stdout=write_fd)
+                    except BaseException:
+                        if read_fd is not None:
+                            os.close(read_fd)
+                        raise
+                    finally:
+                        if stdin != subprocess.DEVNULL:
+                            os.close(stdin)
+                        if write_fd is not None:
+                            os.close(write_fd)
+                    executables.append(p)
+                    stdin = read_fd
+
+                await self._runner.wait_for(asyncio.gather(*[e.wait() for e in executables]), cmds[-1])
+
+        for cmd, e in zip(cmds, executables):
+            if e.returncode != 0:
+                raise subprocess.CalledProcessError(e.returncode, cmd)
+
+    async def chunked_encrypt(
+            self,
+            file_to_encrypt: pathlib.Path,
+            key_fingerprints: List[str],
+            outfile: pathlib.Path,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            workers: Optional[int] = None,
+    ):
+        """
+        Encrypt a file into a chunked ciphertext container.
+
+        The file is split into chunks of `chunk_size` bytes that are encrypted in parallel with a random data key. Only
+        the data key and chunk index are chain-encrypted using the public keys given by `key_fingerprints`.
+
+        Args:
+            file_to_encrypt: Cleartext file to encrypt.
+            key_fingerprints: List of public key fingerprints.
+            outfile: Ciphertext file location.
+            chunk_size: Size in bytes of each chunk of cleartext.
+            workers: Number of chunks to encrypt at once. Defaults to the number of CPUs.
+        """
+        _check_recipients(key_fingerprints)
+        if chunk_size < 1:
+            raise ValueError(f"Chunk size must be positive. Received {chunk_size}.")
+
+        data_key = secrets.token_hex(32)
+        size = file_to_encrypt.stat().st_size
+        chunks: List[Optional[List[int]]] = [None] * max(1, math.ceil(size / chunk_size))
+        semaphore = asyncio.Semaphore(workers or os.cpu_count() or 1)
+        loop = asyncio.get_running_loop()
+
+        # Chunk I/O uses positional reads and writes in the default executor, so that large reads and writes don't
+        # block the event loop and concurrent chunks don't share a file position.
+        with file_to_encrypt.open("rb", buffering=0) as enc_in, outfile.open("wb", buffering=0) as enc_out:
+            _pwrite_all(enc_out.fileno(), CHUNKED_MAGIC, 0)
+            end = len(CHUNKED_MAGIC)
+
+            async def encrypt_chunk(i: int):
+                nonlocal end
+                async with semaphore:
+                    cleartext = await loop.run_in_executor(None, os.pread, enc_in.fileno(), chunk_size, i * chunk_size)
+                    ciphertext = await self._symmetric(["--symmetric"], data_key, i, cleartext)
+
+                    # Reserve space for the chunk before yielding, so that chunks written concurrently don't overlap.
+                    chunks[i] = [end, len(ciphertext)]
+                    end += len(ciphertext)
+                    await loop.run_in_executor(None, _pwrite_all, enc_out.fileno(), ciphertext, chunks[i][0])
+
+            await tontine.process.gather_or_cancel(encrypt_chunk(i) for i in range(len(chunks)))
+
+            header = {"data_key": data_key, "chunk_size": chunk_size, "size": size, "chunks": chunks}
+            with tempfile.TemporaryDirectory() as tmp:
+                header_path = pathlib.Path(tmp) / "header"
+                header_path.write_text(json.dumps(header))
+                await self.chain_encrypt(header_path, key_fingerprints, header_path.with_suffix(".asc"))
+                header_ciphertext = header_path.with_suffix(".asc").read_bytes()
+
+            _pwrite_all(enc_out.fileno(), header_ciphertext + _HEADER_OFFSET.pack(end), end)
+
+    async def chunked_decrypt(
+            self, file_to_decrypt: pathlib.Path, outfile: pathlib.Path, workers: Optional[int] = None,
+    ):
+        """
+        Decrypt a chunked ciphertext container written by `chunked_encrypt`.
+
+        Chunks are decrypted in parallel. Raises a `ValueError` as soon as a corrupt chunk is found, or if the header
+        could not be decrypted or does not describe the whole cleartext.
+
+        Args:
+            file_to_decrypt: Path of the container to decrypt.
+            outfile: Cleartext file location.
+            workers: Number of chunks to decrypt at once. Defaults to the number of CPUs.
+        """
+        semaphore = asyncio.Semaphore(workers or os.cpu_count() or 1)
+
+        with file_to_decrypt.open("rb") as dec_in:
+            if dec_in.read(len(CHUNKED_MAGIC)) != CHUNKED_MAGIC:
+                raise ValueError(f"{file_to_decrypt} is not a chunked ciphertext.")
+
+            dec_in.seek(-_HEADER_OFFSET.size, os.SEEK_END)
+            header_end = dec_in.tell()
+            header_offset, = _HEADER_OFFSET.unpack(dec_in.read(_HEADER_OFFSET.size))
+            if not len(CHUNKED_MAGIC) <= header_offset < header_end:
+                raise ValueError(f"Invalid header offset {header_offset} in {file_to_decrypt}.")
+
+            dec_in.seek(header_offset)
+            with tempfile.TemporaryDirectory() as tmp:
+                header_path = pathlib.Path(tmp) / "header.asc"
+                header_path.write_bytes(dec_in.read(header_end - header_offset))
+                header = json.loads(await self.chain_decrypt(header_path))
+
+            data_key, chunk_size, size, chunks = self._check_chunked_header(header, header_offset, file_to_decrypt)
+
+        loop = asyncio.get_running_loop()
+        with file_to_decrypt.open("rb", buffering=0) as dec_in, outfile.open("wb", buffering=0) as dec_out:
+            dec_out.truncate(size)
+
+            async def decrypt_chunk(i: int, offset: int, length: int):
+                async with semaphore:
+                    ciphertext = await loop.run_in_executor(None, os.pread, dec_in.fileno(), length, offset)
+                    try:
+                        cleartext = await self._symmetric(["--decrypt"], data_key, i, ciphertext)
+                    except (subprocess.CalledProcessError, ValueError):
+                        raise ValueError(f"Chunk {i} at offset {offset} is corrupt.") from None
+
+                    if len(cleartext) != min(chunk_size, size - i * chunk_size):
+                        raise ValueError(f"Chunk {i} at offset {offset} has the wrong length.")
+
+                    await loop.run_in_executor(None, _pwrite_all, dec_out.fileno(), cleartext, i * chunk_size)
+
+            await tontine.process.gather_or_cancel(
+                decrypt_chunk(i, offset, length) for i, (offset, length) in enumerate(chunks)
             )
-            executables.append(p)
 
-            for recipient in key_fingerprints[1:-1]:
-                p = subprocess.Popen(
-                    self.gpg + extra_args + ["--recipient", recipient, "--output", "-", "-"],
-                    stdout=subprocess.PIPE,
-                    stdin=executables[-1].stdout,
+    @staticmethod
+    def _check_chunked_header(
+            header: Dict, header_offset: int, path: pathlib.Path,
+    ) -> Tuple[str, int, int, List[Tuple[int, int]]]:
+        """
+        Check that a decrypted chunked container header describes the whole cleartext and only refers to chunks that
+        lie between the magic bytes and the header.
+
+        Returns: Tuple of the data key, chunk size, cleartext size and list of chunk offsets and lengths.
+        """
+        try:
+            data_key = str(header["data_key"])
+            chunk_size = int(header["chunk_size"])
+            size = int(header["size"])
+            chunks = [(int(offset), int(length)) for offset, length in header["chunks"]]
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Malformed header in {path}.") from None
+
+        if chunk_size < 1 or size < 0:
+            raise ValueError(f"Invalid chunk size {chunk_size} or cleartext size {size} in {path}.")
+
+        expected_chunks = max(1, math.ceil(size / chunk_size))
+        if len(chunks) != expected_chunks:
+            raise ValueError(f"Header in {path} lists {len(chunks)} chunks, but {expected_chunks} are required.")
+
+        for i, (offset, length) in enumerate(chunks):
+            if offset < len(CHUNKED_MAGIC) or length < 0 or offset + length > header_offset:
+                raise ValueError(f"Chunk {i} at offset {offset} with length {length} lies outside the chunk data.")
+
+        return data_key, chunk_size, size, chunks
+
+    async def _symmetric(self, args: List[str], data_key: str, chunk: int, data: bytes) -> bytes:
+        """
+        Run gpg in symmetric mode over `data`, using the passphrase for chunk number `chunk`.
+
+        When decrypting, raises a `ValueError` unless gpg reports that `data` was symmetrically encrypted with that
+        passphrase and passed its integrity check. `gpg --decrypt` also accepts unencrypted data, which would otherwise
+        let a forged chunk through.
+        """
+        # The passphrase is passed through a pipe so that it isn't visible in the process list.
+        read_fd, write_fd = os.pipe()
+        try:
+            os.write(write_fd, f"{data_key}:{chunk}".encode())
+        finally:
+            os.close(write_fd)
+
+        # Status lines are only a few hundred bytes, so they fit in the pipe buffer until gpg exits.
+        status_read_fd, status_write_fd = os.pipe()
+
+        # The data key is already random, so there is nothing to gain from gpg's default passphrase stretching.
+        extra_args = [
+            "--batch", "--pinentry-mode", "loopback", "--no-symkey-cache", "--passphrase-fd", str(read_fd),
+            "--status-fd", str(status_write_fd), "--s2k-digest-algo", "SHA256", "--s2k-count", "1024",
+            "--cipher-algo", "AES256", "--compress-algo", "none", "--force-mdc", "--yes",
+        ]
+        try:
+            try:
+                stdout = await self._runner.run(
+                    self.gpg + extra_args + args + ["--output", "-", "-"],
+                    input=data, pass_fds=(read_fd, status_write_fd), stderr=subprocess.DEVNULL,
                 )
-                executables.append(p)
+            finally:
+                os.close(read_fd)
+                os.close(status_write_fd)
 
-            p = subprocess.Popen(
-                self.gpg + extra_args + ["--recipient", key_fingerprints[-1], "--output", str(outfile), "-"],
-                stdin=executables[-1].stdout,
-            )
-            executables.append(p)
+            with open(status_read_fd, "rb", closefd=False) as status_in:
+                status = status_in.read().decode().split("\n")
+        finally:
+            os.close(status_read_fd)
 
-        for e in executables[:-1]:
-            e.stdout.close()
+        keywords = set()
+        for ln in status:
+            cpts = ln.split()
+            if cpts[:1] == ["[GNUPG:]"] and len(cpts) > 1:
+                keywords.add(cpts[1])
 
-        executables[-1].communicate()
-        executables[-1].wait()
+        if "--decrypt" in args and not {"DECRYPTION_OKAY", "GOODMDC"} <= keywords:
+            raise ValueError(f"Chunk {chunk} is not authenticated.")
+
+        return stdout
 
     @staticmethod
     def _parse_list_keys_stdout(stdout: str) -> List[Key]:
@@ -202,6 +544,130 @@ class Keyring:
             elif cpts[0] == "uid":
                 name = cpts[9]
 
-        keys.append(Key(name, fingerprint, subkeys))
+        if fingerprint is not None:
+            keys.append(Key(name, fingerprint, subkeys))
 
         return keys
+
+
+class Keyring:
+    def __init__(self, location: pathlib.Path, gpg_exe: str = "gpg", timeout: Optional[float] = None):
+        """
+        Initialise a new keyring object.
+
+        A Keyring object is a limited interface to the `gpg` executable. It provides the methods required to
+        sequentially encrypt or decrypt a file.
+
+        This interface always passes `--homedir` to `gpg`, so it won't touch existing keys on a system.
+
+        Each method is a blocking wrapper around the corresponding method of `AsyncKeyring`.
+
+        Args:
+            location: Location of the GPG home directory used for storing keypairs.
+            gpg_exe: GPG executable location.
+            timeout: Timeout in seconds for each gpg command. Methods such as `chain_decrypt` run several commands in
+                turn, so may take longer than this in total. `None` means no timeout.
+        """
+        self._keyring = AsyncKeyring(location, gpg_exe, timeout=timeout)
+
+    _parse_list_keys_stdout = staticmethod(AsyncKeyring._parse_list_keys_stdout)
+
+    @property
+    def location(self) -> pathlib.Path:
+        return self._keyring.location
+
+    @property
+    def gpg(self):
+        return self._keyring.gpg
+
+    def import_key(self, key_file: pathlib.Path) -> List[str]:
+        """
+        Import public or private keys into the keyring.
+
+        Args:
+            key_file: Location of the key file (public or private) to import.
+
+        Returns:
+            Fingerprints of the keys contained in `key_file`, in the order they appear in the file.
+        """
+        return tontine.process.run_sync(self._keyring.import_key(key_file))
+
+    def get_key(self, key_id: str, secret: bool = False) -> Key:
+        """
+        Look up a key by its fingerprint, key ID, or the fingerprint or ID of one of its subkeys.
+
+        Raises a `KeyError` if no such key is in the keyring.
+
+        Args:
+            key_id: Fingerprint or ID of the key or one of its subkeys.
+            secret: Look up secret keys instead of public keys.
+        """
+        return tontine.process.run_sync(self._keyring.get_key(key_id, secret))
+
+    def list_public_keys(self) -> List[Key]:
+        """Get list of all public keys in keyring."""
+        return tontine.process.run_sync(self._keyring.list_public_keys())
+
+    def list_secret_keys(self) -> List[Key]:
+        """Get list of all secret keys in keyring."""
+        return tontine.process.run_sync(self._keyring.list_secret_keys())
+
+    def chain_decrypt(self, file_to_decrypt: pathlib.Path) -> str:
+        """
+        Repeatedly decrypt file until a cleartext message is returned.
+
+        Raises a `ValueError` if the file could not be decrypted.
+
+        Args:
+            file_to_decrypt: Path of the file to decrypt.
+
+        Returns:
+            The cleartext of the decrypted file.
+        """
+        return tontine.process.run_sync(self._keyring.chain_decrypt(file_to_decrypt))
+
+    def chain_encrypt(self, file_to_encrypt: pathlib.Path, key_fingerprints: List[str], outfile: pathlib.Path):
+        """
+        Repeatedly encrypt a file using the public keys given by `key_fingerprints`.
+
+        Args:
+            file_to_encrypt: Cleartext file to encrypt.
+            key_fingerprints: List of public key fingerprints.
+            outfile: Ciphertext file location.
+        """
+        tontine.process.run_sync(self._keyring.chain_encrypt(file_to_encrypt, key_fingerprints, outfile))
+
+    def chunked_encrypt(
+            self,
+            file_to_encrypt: pathlib.Path,
+            key_fingerprints: List[str],
+            outfile: pathlib.Path,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            workers: Optional[int] = None,
+    ):
+        """
+        Encrypt a file into a chunked ciphertext container.
+
+        Args:
+            file_to_encrypt: Cleartext file to encrypt.
+            key_fingerprints: List of public key fingerprints.
+            outfile: Ciphertext file location.
+            chunk_size: Size in bytes of each chunk of cleartext.
+            workers: Number of chunks to encrypt at once. Defaults to the number of CPUs.
+        """
+        tontine.process.run_sync(
+            self._keyring.chunked_encrypt(file_to_encrypt, key_fingerprints, outfile, chunk_size, workers)
+        )
+
+    def chunked_decrypt(self, file_to_decrypt: pathlib.Path, outfile: pathlib.Path, workers: Optional[int] = None):
+        """
+        Decrypt a chunked ciphertext container written by `chunked_encrypt`.
+
+        Raises a `ValueError` if a chunk is corrupt or the header could not be decrypted.
+
+        Args:
+            file_to_decrypt: Path of the container to decrypt.
+            outfile: Cleartext file location.
+            workers: Number of chunks to decrypt at once. Defaults to the number of CPUs.
+        """
+        tontine.process.run_sync(self._keyring.chunked_decrypt(file_to_decrypt, outfile, workers))
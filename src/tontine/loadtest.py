@@ -0,0 +1,460 @@
+"""
+Offline load-test harness for the `tontine` command line interface.
+
+The harness generates (and caches) synthetic investor keypairs, writes stand-in `dogecoin-cli` and `electrum`
+executables that return configurable amounts of data after a configurable delay, and then runs complete
+address -> check -> encrypt -> exercise scenarios concurrently against the real `tontine` CLI. Run it with:
+
+    python -m tontine.loadtest --investors 50 --scenarios 20 --concurrency 4
+
+Latency, throughput and peak memory usage are reported for each phase. Memory is sampled from `/proc` and summed over
+each `tontine` process and its children, such as the gpg processes started by `encrypt`. The peak memory used by all
+concurrent scenarios together is reported as well. Pages shared between processes are counted once per process, so
+these figures are an upper bound. `/proc` is only available on Linux, so memory is reported as unavailable elsewhere.
+"""
+import asyncio
+import concurrent.futures
+import dataclasses
+import json
+import math
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import click
+
+import tontine
+import tontine.process
+
+PHASES = ("address", "check", "encrypt", "exercise")
+
+# Process information is read from here, so memory can only be measured on Linux.
+PROC = "/proc"
+
+# Template for the fake wallet executables. Formatted with the location of the JSON configuration and the kind of
+# wallet ("doge" or "electrum").
+FAKE_CLI_TEMPLATE = textwrap.dedent('''\
+    #!{python}
+    import json
+    import pathlib
+    import sys
+    import time
+
+    with open({config!r}) as config_in:
+        config = json.load(config_in)
+
+    time.sleep(config["latency"])
+
+    # Drop flags such as "-testnet", "--testnet" and "-w WALLET" so only the command and its arguments remain.
+    args = sys.argv[1:]
+    if "-w" in args:
+        del args[args.index("-w"):args.index("-w") + 2]
+    args = [a for a in args if not a.startswith("-")]
+    command = args[0]
+
+    payload = "x" * config["dump_size"]
+    if {kind!r} == "doge":
+        if command == "listunspent":
+            unspent = [
+                {{"address": f"addr{{i}}", "amount": 1.0, "spendable": True, "confirmations": 10}}
+                for i in range(config["unspent"])
+            ]
+            print(json.dumps(unspent))
+        elif command == "dumpwallet":
+            pathlib.Path(args[1]).write_text(payload)
+        elif command == "getnewaddress":
+            print("addr0")
+    else:
+        if command == "listunspent":
+            print(json.dumps([{{"address": f"addr{{i}}", "value": "1.0"}} for i in range(config["unspent"])]))
+        elif command == "getseed":
+            print(payload)
+        elif command in ("getunusedaddress", "createnewaddress"):
+            print("addr0")
+''')
+
+
+@dataclasses.dataclass
+class FakeWalletConfig:
+    """Behaviour of the stand-in wallet executables."""
+    unspent: int = 10
+    latency: float = 0.0
+    dump_size: int = 1024
+
+
+@dataclasses.dataclass
+class PhaseResult:
+    phase: str
+    started: float
+    seconds: float
+    peak_tree_rss_kb: Optional[int]
+    ok: bool
+
+
+def _read_processes() -> Tuple[Dict[int, int], Dict[int, List[int]]]:
+    """
+    Read the resident memory and parent of every process from `PROC`.
+
+    Returns: Tuple of maps from PID to resident memory in KiB, and from PID to the PIDs of its children.
+    """
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    rss: Dict[int, int] = {}
+    children: Dict[int, List[int]] = {}
+
+    for entry in os.listdir(PROC):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(os.path.join(PROC, entry, "stat")) as stat_in:
+                stat = stat_in.read()
+        except OSError:
+            # The process exited while we were listing.
+            continue
+
+        # The command name in field 2 may contain spaces, so split after it. Field 4 is the parent PID and field 24
+        # is the resident set size in pages.
+        fields = stat.rsplit(")", 1)[1].split()
+        pid = int(entry)
+        rss[pid] = int(fields[21]) * page_kb
+        children.setdefault(int(fields[1]), []).append(pid)
+
+    return rss, children
+
+
+def _tree_rss_kb(root: int, rss: Dict[int, int], children: Dict[int, List[int]]) -> int:
+    """Summed resident memory of `root` and all of its descendants."""
+    total = 0
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class MemorySampler:
+    def __init__(self, interval: float = 0.02):
+        """
+        Sample the summed resident memory of process trees in a background thread.
+
+        Each registered process is tracked together with its descendants. The peak of all descendants of the harness
+        is tracked as `peak_total_kb`.
+
+        Sampling requires `PROC`. If it does not exist, `available` is false, nothing is sampled and peaks are `None`.
+
+        Args:
+            interval: Time in seconds between samples.
+        """
+        self.interval = interval
+        self.available = os.path.isdir(PROC)
+        self.peak_total_kb: Optional[int] = 0 if self.available else None
+        self._peaks: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self) -> "MemorySampler":
+        if self.available:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self.available:
+            self._thread.join()
+
+    def register(self, pid: int):
+        with self._lock:
+            self._peaks[pid] = 0
+
+    def unregister(self, pid: int) -> Optional[int]:
+        """
+        Stop tracking `pid`, returning the peak summed resident memory of its process tree in KiB, or `None` if memory
+        cannot be sampled.
+        """
+        with self._lock:
+            peak = self._peaks.pop(pid)
+        return peak if self.available else None
+
+    def _sample(self):
+        harness = os.getpid()
+        while not self._stop.wait(self.interval):
+            rss, children = _read_processes()
+            with self._lock:
+                for pid, peak in self._peaks.items():
+                    self._peaks[pid] = max(peak, _tree_rss_kb(pid, rss, children))
+            total = _tree_rss_kb(harness, rss, children) - rss.get(harness, 0)
+            self.peak_total_kb = max(self.peak_total_kb, total)
+
+
+def write_fake_clis(directory: pathlib.Path, config: FakeWalletConfig) -> Tuple[pathlib.Path, pathlib.Path]:
+    """
+    Write stand-in `dogecoin-cli` and `electrum` executables into `directory`.
+
+    Returns: Tuple of paths to the fake `dogecoin-cli` and `electrum` executables.
+    """
+    config_path = directory / "fake-wallet.json"
+    with config_path.open("w") as config_out:
+        json.dump(dataclasses.asdict(config), config_out)
+
+    paths = []
+    for kind, name in [("doge", "dogecoin-cli"), ("electrum", "electrum")]:
+        path = directory / name
+        path.write_text(FAKE_CLI_TEMPLATE.format(python=sys.executable, config=str(config_path), kind=kind))
+        path.chmod(0o755)
+        paths.append(path)
+
+    return paths[0], paths[1]
+
+
+async def _generate_keypair(
+        runner: tontine.process.ProcessRunner, gpg_exe: str, name: str, public_key: pathlib.Path,
+        secret_key: pathlib.Path,
+):
+    with tempfile.TemporaryDirectory() as homedir:
+        gpg = [gpg_exe, "--homedir", homedir, "--batch", "--pinentry-mode", "loopback", "--passphrase", ""]
+        try:
+            await runner.run(gpg + ["--quick-generate-key", name, "future-default", "default", "never"],
+                             stderr=subprocess.DEVNULL)
+            public = await runner.run(gpg + ["--export", "--armor", name])
+            secret = await runner.run(gpg + ["--export-secret-keys", "--armor", name])
+        finally:
+            await runner.run(["gpgconf", "--homedir", homedir, "--kill", "gpg-agent"])
+
+    public_key.write_bytes(public)
+    secret_key.write_bytes(secret)
+
+
+def investor_keys(
+        cache_dir: pathlib.Path, count: int, gpg_exe: str = "gpg", max_concurrency: int = 8,
+) -> List[Tuple[pathlib.Path, pathlib.Path]]:
+    """
+    Get `count` synthetic investor keypairs, generating any that are not already in `cache_dir`.
+
+    The keys have no passphrase and never expire.
+
+    Returns: List of tuples of paths to the public, private key.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    keys = [(cache_dir / f"investor-{i:04d}.pub", cache_dir / f"investor-{i:04d}") for i in range(count)]
+
+    runner = tontine.process.ProcessRunner(max_concurrency)
+
+    async def generate():
+        await asyncio.gather(*[
+            _generate_keypair(runner, gpg_exe, f"Investor {i}", public, secret)
+            for i, (public, secret) in enumerate(keys)
+            if not (public.exists() and secret.exists())
+        ])
+
+    tontine.process.run_sync(generate())
+
+    return keys
+
+
+def _run_phase(
+        sampler: MemorySampler, phase: str, cmd: Sequence[str], stdout=subprocess.DEVNULL,
+) -> Tuple[PhaseResult, Optional[bytes]]:
+    """Run a single CLI invocation, measuring its latency and peak memory usage."""
+    env = dict(os.environ)
+    package_parent = str(pathlib.Path(tontine.__file__).parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+
+    started = time.monotonic()
+    p = subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.DEVNULL, env=env)
+    sampler.register(p.pid)
+    output = None
+    if stdout == subprocess.PIPE:
+        output = p.stdout.read()
+        p.stdout.close()
+
+    # A process may exit between samples, so the peak memory of the largest single process in the tree, from `wait4`,
+    # is used as a lower bound.
+    _, status, rusage = os.wait4(p.pid, 0)
+    p.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    seconds = time.monotonic() - started
+    peak_tree_rss_kb = sampler.unregister(p.pid)
+    if peak_tree_rss_kb is not None:
+        peak_tree_rss_kb = max(peak_tree_rss_kb, rusage.ru_maxrss)
+
+    return PhaseResult(phase, started, seconds, peak_tree_rss_kb, p.returncode == 0), output
+
+
+def run_scenario(
+        sampler: MemorySampler,
+        workdir: pathlib.Path, wallet_args: List[str], keys: List[Tuple[pathlib.Path, pathlib.Path]],
+        expected_cleartext: str, gpg_exe: str, chunk_size: Optional[int] = None,
+) -> List[PhaseResult]:
+    """Run address -> check -> encrypt -> exercise through the `tontine` CLI."""
+    workdir.mkdir(parents=True)
+    tontine_cli = [sys.executable, "-m", "tontine.tontine"] + wallet_args
+    ciphertext = workdir / "wallet.asc"
+
+    results = [
+        _run_phase(sampler, "address", tontine_cli + ["setup", "address"])[0],
+        _run_phase(sampler, "check", tontine_cli + ["setup", "check"])[0],
+    ]
+
+    encrypt_args = ["setup", "encrypt", "--gpg", gpg_exe]
+    if chunk_size is not None:
+        encrypt_args += ["--chunk-size", str(chunk_size)]
+
+    with ciphertext.open("wb") as ciphertext_out:
+        result, _ = _run_phase(
+            sampler, "encrypt", tontine_cli + encrypt_args + [str(k[0]) for k in keys], stdout=ciphertext_out,
+        )
+    results.append(result)
+
+    result, cleartext = _run_phase(
+        sampler, "exercise", tontine_cli + ["exercise", "--gpg", gpg_exe, str(ciphertext)] + [str(k[1]) for k in keys],
+        stdout=subprocess.PIPE,
+    )
+    # Only the cleartext of an ordinary ciphertext is stripped; a chunked one must come back exactly.
+    if chunk_size is None:
+        cleartext = cleartext.strip()
+    result.ok = result.ok and cleartext.decode() == expected_cleartext
+    results.append(result)
+
+    return results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def summarise(results: List[PhaseResult]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Summarise latency, throughput and peak memory for each phase. Peak memory is `None` if it was not measured."""
+    summary = {}
+    for phase in PHASES:
+        phase_results = [r for r in results if r.phase == phase]
+        if not phase_results:
+            continue
+
+        latencies = [r.seconds for r in phase_results]
+        peaks = [r.peak_tree_rss_kb for r in phase_results]
+        wall = max(r.started + r.seconds for r in phase_results) - min(r.started for r in phase_results)
+        summary[phase] = {
+            "count": len(phase_results),
+            "errors": sum(not r.ok for r in phase_results),
+            "throughput_per_second": len(phase_results) / wall if wall > 0 else float("inf"),
+            "p50_seconds": percentile(latencies, 50),
+            "p90_seconds": percentile(latencies, 90),
+            "p99_seconds": percentile(latencies, 99),
+            "max_seconds": max(latencies),
+            "peak_tree_rss_mb": max(peaks) / 1024 if None not in peaks else None,
+        }
+
+    return summary
+
+
+def run(
+        investors: int,
+        scenarios: int,
+        concurrency: int,
+        wallet: str = "doge",
+        fake_config: Optional[FakeWalletConfig] = None,
+        key_cache: Optional[pathlib.Path] = None,
+        gpg_exe: str = "gpg",
+        chunk_size: Optional[int] = None,
+) -> Tuple[Dict[str, Dict[str, Optional[float]]], Optional[float]]:
+    """
+    Run `scenarios` complete tontines, `concurrency` at a time, each with `investors` investors.
+
+    Returns: Tuple of the summary of each phase, as returned by `summarise`, and the peak memory in MiB used by all
+        concurrent scenarios together, or `None` if memory could not be measured.
+    """
+    if investors < 2:
+        raise ValueError(f"At least 2 investors are required. Received {investors}.")
+
+    fake_config = fake_config or FakeWalletConfig()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = pathlib.Path(tmp)
+        keys = investor_keys(key_cache or workdir / "keys", investors, gpg_exe)
+        doge_cli, electrum_cli = write_fake_clis(workdir, fake_config)
+
+        if wallet == "doge":
+            wallet_args = ["doge", "--doge-cli", str(doge_cli)]
+        else:
+            wallet_args = ["electrum", "--electrum-cli", str(electrum_cli), str(workdir / "electrum-wallet")]
+        expected_cleartext = "x" * fake_config.dump_size
+
+        with MemorySampler() as sampler, concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+            futures = [
+                executor.submit(
+                    run_scenario, sampler, workdir / f"scenario-{i}", wallet_args, keys, expected_cleartext, gpg_exe,
+                    chunk_size,
+                )
+                for i in range(scenarios)
+            ]
+            results = [r for f in futures for r in f.result()]
+
+    peak_total_rss_mb = sampler.peak_total_kb / 1024 if sampler.peak_total_kb is not None else None
+    return summarise(results), peak_total_rss_mb
+
+
+@click.command()
+@click.option("--investors", type=click.IntRange(min=2), default=3, help="Number of investors in each tontine.")
+@click.option("--scenarios", type=click.IntRange(min=1), default=10, help="Number of tontines to run.")
+@click.option("--concurrency", type=click.IntRange(min=1), default=4, help="Number of tontines to run at once.")
+@click.option("--wallet", type=click.Choice(["doge", "electrum"]), default="doge", help="Wallet type to use.")
+@click.option("--unspent", type=click.IntRange(min=0), default=10,
+              help="Number of entries returned by the fake wallet's listunspent.")
+@click.option("--latency", type=float, default=0.0, help="Delay in seconds before each fake wallet command returns.")
+@click.option("--dump-size", type=click.IntRange(min=1), default=1024,
+              help="Size in bytes of the fake wallet dump.")
+@click.option("--key-cache", type=click.Path(file_okay=False, path_type=pathlib.Path), default=None,
+              help="Directory in which to cache generated investor keys between runs.")
+@click.option("--gpg", type=str, default="gpg", help="Optional path to gpg executable.")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=None,
+              help="Encrypt wallets into chunked ciphertexts with chunks of this many bytes.")
+def main(
+        investors: int, scenarios: int, concurrency: int, wallet: str, unspent: int, latency: float, dump_size: int,
+        key_cache: Optional[pathlib.Path], gpg: str, chunk_size: Optional[int],
+):
+    """
+    Run complete tontines concurrently against fake wallets and report per-phase performance.
+    """
+    start = time.monotonic()
+    fake_config = FakeWalletConfig(unspent, latency, dump_size)
+    summary, peak_total_rss_mb = run(investors, scenarios, concurrency, wallet, fake_config, key_cache, gpg, chunk_size)
+    elapsed = time.monotonic() - start
+
+    print(f"{scenarios} tontines with {investors} investors in {elapsed:.2f}s "
+          f"({scenarios / elapsed:.2f} tontines/s, concurrency {concurrency})")
+    if peak_total_rss_mb is None:
+        print(f"Peak memory is unavailable because {PROC} does not exist on this system.")
+    else:
+        print(f"Peak memory of all concurrent tontines: {peak_total_rss_mb:.1f} MiB")
+    print()
+    print("peak_tree_rss_mb is the peak memory of a single tontine command, including the gpg processes it starts.")
+    print()
+    fields = ["count", "errors", "throughput_per_second", "p50_seconds", "p90_seconds", "p99_seconds", "max_seconds",
+              "peak_tree_rss_mb"]
+    print("\t".join(["phase"] + fields))
+    for phase, stats in summary.items():
+        cells = [phase]
+        for f in fields:
+            if stats[f] is None:
+                cells.append("unavailable")
+            elif isinstance(stats[f], float):
+                cells.append(f"{stats[f]:.3f}")
+            else:
+                cells.append(str(stats[f]))
+        print("\t".join(cells))
+
+    if any(stats["errors"] for stats in summary.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import asyncio
+import contextlib
+import subprocess
+from typing import Any, AsyncIterator, Awaitable, Iterable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    This is what the blocking APIs use to call into their async implementations, so it must not be called from a thread
+    that is already running an event loop.
+    """
+    return asyncio.run(coro)
+
+
+async def gather_or_cancel(aws: Iterable[Awaitable[Any]]) -> None:
+    """
+    Run awaitables concurrently, stopping as soon as any of them fails.
+
+    The remaining awaitables are cancelled (killing any processes they started) and the first exception is raised.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return
+
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except BaseException:
+        done, pending = set(), set(tasks)
+        raise
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in done:
+        task.result()
+
+
+class ProcessRunner:
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Run child processes with asyncio, limiting how many run at once and how long each may take.
+
+        Child processes are killed if the coroutine waiting on them is cancelled or times out, so no orphaned process
+        is left behind.
+
+        Args:
+            max_concurrency: Maximum number of commands that may run at once, counting a pipeline of commands as one.
+                `None` means no limit.
+            timeout: Default timeout, in seconds, for each command or pipeline. `None` means no timeout.
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1. Received {max_concurrency}.")
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        # Semaphores belong to the event loop they are first used on. The sync wrappers start a new loop for every
+        # call, so the semaphore is recreated whenever the loop changes.
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Wait until fewer than `max_concurrency` commands are running."""
+        if self.max_concurrency is None:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        async with self._semaphore:
+            yield
+
+    async def run(
+            self,
+            cmd: Sequence[str],
+            input: Optional[bytes] = None,
+            timeout: Optional[float] = None,
+            **kwargs: Any,
+    ) -> bytes:
+        """
+        Run a command and return its standard output.
+
+        Raises `subprocess.CalledProcessError` if the command fails and `subprocess.TimeoutExpired` if it does not
+        complete in time, in the same way as `subprocess.run(..., check=True)`.
+
+        Args:
+            cmd: Command to execute.
+            input: Bytes to send to the standard input of the command.
+            timeout: Timeout for this command, overriding the default timeout of the runner.
+            kwargs: Passed to `asyncio.create_subprocess_exec`.
+
+        Returns:
+            Standard output of the command.
+        """
+        if input is not None:
+            kwargs["stdin"] = subprocess.PIPE
+        kwargs.setdefault("stdout", subprocess.PIPE)
+
+        async with self.slot():
+            p = await asyncio.create_subprocess_exec(*cmd, **kwargs)
+            async with self.reap([p]):
+                stdout, _ = await self.wait_for(p.communicate(input), cmd, timeout)
+
+        if p.returncode != 0:
+            raise subprocess.CalledProcessError(p.returncode, list(cmd), stdout)
+
+        return stdout
+
+    async def wait_for(self, aw: Awaitable[T], cmd: Sequence[str], timeout: Optional[float] = None) -> T:
+        """Await `aw`, raising `subprocess.TimeoutExpired` if it takes longer than the timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(aw, timeout)
+        except asyncio.TimeoutError:
+            raise subprocess.TimeoutExpired(list(cmd), timeout) from None
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def reap(processes: List[asyncio.subprocess.Process]) -> AsyncIterator[None]:
+        """Kill any of `processes` that are still running if the enclosed block raises (including on cancellation)."""
+        try:
+            yield
+        except BaseException:
+            for p in processes:
+                if p.returncode is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        p.kill()
+            # Shield the wait so that a second cancellation cannot leave zombie processes behind.
+            await asyncio.shield(asyncio.gather(*[p.wait() for p in processes]))
+            raise
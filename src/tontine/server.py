@@ -0,0 +1,399 @@
+import asyncio
+import dataclasses
+import json
+import pathlib
+import signal
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import tontine.keys
+import tontine.process
+from tontine.wallet.base import Wallet
+
+# Operations that are queued and run by the worker pool.
+JOB_OPS = ("address", "check", "encrypt", "exercise")
+
+# Maximum length of a single request or response line. Responses can contain a whole ciphertext or wallet, so this is
+# much larger than the asyncio default of 64 KiB. Larger payloads should be written to an `output` file instead.
+STREAM_LIMIT = 256 * 1024 * 1024
+
+
+@dataclasses.dataclass
+class JobStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    total_wait_seconds: float = 0.0
+
+    def record(self, wait_seconds: float, run_seconds: float, ok: bool):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total_seconds += run_seconds
+        self.max_seconds = max(self.max_seconds, run_seconds)
+        self.total_wait_seconds += wait_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "max_seconds": self.max_seconds,
+            "mean_wait_seconds": self.total_wait_seconds / self.count if self.count else 0.0,
+        }
+
+
+@dataclasses.dataclass
+class _Job:
+    request: Dict[str, Any]
+    future: asyncio.Future
+    enqueued: float
+
+
+class Server:
+    def __init__(
+            self,
+            wallet: Wallet,
+            socket_path: pathlib.Path,
+            gpg_exe: str = "gpg",
+            workers: int = 4,
+            queue_size: int = 64,
+            timeout: Optional[float] = None,
+    ):
+        """
+        Long-running tontine server.
+
+        The server listens on a Unix socket for newline-delimited JSON requests such as `{"op": "check"}` and replies
+        to each with a single line of JSON, either `{"ok": true, "result": ...}` or `{"ok": false, "error": ...}`.
+
+        Jobs are placed on a bounded queue and run by a fixed pool of workers. If the queue is full, the job is
+        rejected immediately rather than waiting, so that clients see backpressure. The `metrics` operation is answered
+        without queueing and reports the queue depth and per-operation latencies.
+
+        The wallet is kept for the lifetime of the server, as is a keyring of the public keys used for encryption, so
+        each public key file is only imported once. Keyrings holding secret keys for `exercise` jobs are deleted as
+        soon as the job is complete. As with the `exercise` command, the cleartext of an ordinary ciphertext has
+        leading and trailing whitespace stripped, while that of a chunked ciphertext is returned exactly.
+
+        Args:
+            wallet: Wallet used for `address`, `check` and `encrypt` jobs.
+            socket_path: Location of the Unix socket to listen on.
+            gpg_exe: GPG executable location.
+            workers: Number of jobs that may run at once.
+            queue_size: Maximum number of jobs waiting for a worker.
+            timeout: Timeout in seconds for each gpg command. `None` means no timeout.
+        """
+        if workers < 1:
+            raise ValueError(f"At least one worker is required. Received {workers}.")
+
+        self.wallet = wallet
+        self.socket_path = socket_path
+        self.gpg_exe = gpg_exe
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+        self.stats: Dict[str, JobStats] = {op: JobStats() for op in JOB_OPS}
+        self.rejected = 0
+        self.in_flight = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._keyring_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._public_keyring: Optional[tontine.keys.AsyncKeyring] = None
+
+        # Map of public key file path and modification time to the fingerprints of the keys in that file.
+        self._key_files: Dict[Tuple[str, int], List[str]] = {}
+
+    async def start(self):
+        """Start the workers and begin listening on the socket."""
+        self._queue = asyncio.Queue(self.queue_size)
+        self._keyring_dir = tempfile.TemporaryDirectory()
+        self._public_keyring = tontine.keys.AsyncKeyring(
+            pathlib.Path(self._keyring_dir.name), self.gpg_exe, timeout=self.timeout
+        )
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=str(self.socket_path), limit=STREAM_LIMIT
+        )
+
+    async def close(self):
+        """
+        Stop listening, fail running and queued jobs, close client connections and remove the socket and cached
+        keyrings.
+        """
+        if self._server is not None:
+            self._server.close()
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Server is shutting down."))
+
+        # Let connection handlers send the failures above before their connections are closed.
+        await asyncio.sleep(0)
+        for writer in list(self._writers):
+            writer.close()
+
+        # Since Python 3.12.1, this also waits for the connections closed above to finish.
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+        if self._keyring_dir is not None:
+            self._keyring_dir.cleanup()
+            self._keyring_dir = None
+            self._public_keyring = None
+            self._key_files = {}
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    async def serve_forever(self):
+        """Start the server and run until cancelled or sent SIGINT or SIGTERM, then close it."""
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+
+        def request_stop():
+            if not stop.done():
+                stop.set_result(None)
+
+        signals = [signal.SIGINT, signal.SIGTERM]
+        for sig in signals:
+            loop.add_signal_handler(sig, request_stop)
+
+        try:
+            await self.start()
+            await stop
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            await self.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "jobs": {op: stats.as_dict() for op, stats in self.stats.items()},
+        }
+
+    async def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle a single request and return the response.
+
+        Raises a `ValueError` for unknown operations and a `RuntimeError` if the queue is full.
+        """
+        op = request.get("op")
+        if op == "metrics":
+            return self.metrics()
+        if op not in JOB_OPS:
+            raise ValueError(f"Unknown operation {op!r}. Expected one of {('metrics',) + JOB_OPS}.")
+
+        job = _Job(request, asyncio.get_running_loop().create_future(), time.monotonic())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise RuntimeError(f"Job queue is full ({self.queue_size} jobs waiting).") from None
+
+        return await job.future
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The rest of an oversized line can't be skipped reliably, so report it and drop the connection.
+                    error = {"ok": False, "error": f"Request is longer than the limit of {STREAM_LIMIT} bytes."}
+                    writer.write(json.dumps(error).encode() + b"\n")
+                    await writer.drain()
+                    break
+
+                if not line:
+                    break
+
+                try:
+                    response = {"ok": True, "result": await self.submit(json.loads(line))}
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.future.cancelled():
+                self._queue.task_done()
+                continue
+
+            started = time.monotonic()
+            self.in_flight += 1
+            ok = False
+            try:
+                result = await self._run(job.request)
+                ok = True
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_exception(RuntimeError("Server is shutting down."))
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.in_flight -= 1
+                self.stats[job.request["op"]].record(started - job.enqueued, time.monotonic() - started, ok)
+                self._queue.task_done()
+
+    async def _run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request["op"]
+        if op == "address":
+            return {"address": await self.wallet.receiving_address_async()}
+        elif op == "check":
+            return await self._check()
+        elif op == "encrypt":
+            output = request.get("output")
+            return await self._encrypt(
+                [pathlib.Path(p) for p in request["public_keys"]],
+                pathlib.Path(output) if output is not None else None,
+                request.get("chunk_size"),
+            )
+        else:
+            output = request.get("output")
+            return await self._exercise(
+                pathlib.Path(request["ciphertext"]),
+                [pathlib.Path(p) for p in request["private_keys"]],
+                pathlib.Path(output) if output is not None else None,
+            )
+
+    async def _check(self) -> Dict[str, Any]:
+        balance = await self.wallet.list_unspent_async()
+        return {
+            "total_spendable": sum([b.amount for b in balance if b.spendable]),
+            "balances": [dataclasses.asdict(b) for b in balance],
+        }
+
+    async def _recipients(self, public_keys: List[pathlib.Path]) -> List[str]:
+        """Get the fingerprints of the keys in `public_keys`, in order, importing each file only once."""
+        fingerprints = []
+        for key_file in public_keys:
+            cache_key = (str(key_file.resolve()), key_file.stat().st_mtime_ns)
+            if cache_key not in self._key_files:
+                self._key_files[cache_key] = await self._public_keyring.import_key(key_file)
+            fingerprints += self._key_files[cache_key]
+
+        return fingerprints
+
+    async def _encrypt(
+            self, public_keys: List[pathlib.Path], output: Optional[pathlib.Path], chunk_size: Optional[int],
+    ) -> Dict[str, Any]:
+        if len(public_keys) < 2:
+            raise ValueError("At least 2 public keys required.")
+        if chunk_size is not None and output is None:
+            raise ValueError("An output path is required for chunked ciphertexts.")
+
+        keyring = self._public_keyring
+        key_fingerprints = await self._recipients(public_keys)
+        if len(set(key_fingerprints)) != len(key_fingerprints):
+            raise ValueError("Each public key may only be used once.")
+
+        with tempfile.TemporaryDirectory() as workdir:
+            wallet_path = pathlib.Path(workdir) / "wallet"
+            ciphertext_path = pathlib.Path(workdir) / "ciphertext"
+
+            await self.wallet.dump_wallet_async(wallet_path)
+            if chunk_size is not None:
+                await keyring.chunked_encrypt(wallet_path, key_fingerprints, output, chunk_size)
+                return {"output": str(output)}
+            if output is not None:
+                await keyring.chain_encrypt(wallet_path, key_fingerprints, output)
+                return {"output": str(output)}
+
+            await keyring.chain_encrypt(wallet_path, key_fingerprints, ciphertext_path)
+            # Reading a large ciphertext on the event loop would stall every other job.
+            ciphertext = await asyncio.get_running_loop().run_in_executor(None, ciphertext_path.read_text)
+
+        return {"ciphertext": ciphertext}
+
+    async def _exercise(
+            self, ciphertext: pathlib.Path, private_keys: List[pathlib.Path], output: Optional[pathlib.Path],
+    ) -> Dict[str, Any]:
+        if len(private_keys) < 2:
+            raise ValueError("At least 2 private keys required.")
+
+        with tempfile.TemporaryDirectory() as keyring_path:
+            keyring = tontine.keys.AsyncKeyring(pathlib.Path(keyring_path), self.gpg_exe, timeout=self.timeout)
+            for key in private_keys:
+                await keyring.import_key(key)
+
+            if tontine.keys.is_chunked(ciphertext):
+                # Large wallets should be decrypted straight into `output` rather than returned inline.
+                cleartext_path = output or pathlib.Path(keyring_path) / "cleartext"
+                await keyring.chunked_decrypt(ciphertext, cleartext_path)
+                if output is not None:
+                    return {"output": str(output)}
+                cleartext = await asyncio.get_running_loop().run_in_executor(None, cleartext_path.read_text)
+            else:
+                cleartext = (await keyring.chain_decrypt(ciphertext)).strip()
+                if output is not None:
+                    await asyncio.get_running_loop().run_in_executor(None, output.write_text, cleartext)
+                    return {"output": str(output)}
+
+        return {"cleartext": cleartext}
+
+
+class Client:
+    def __init__(self, socket_path: pathlib.Path):
+        """
+        Client for a tontine `Server`.
+
+        File paths in requests are opened by the server, so they should be absolute.
+
+        Args:
+            socket_path: Location of the server's Unix socket.
+        """
+        self.socket_path = socket_path
+
+    async def request_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request to the server, raising a `RuntimeError` if it fails, and return the result."""
+        reader, writer = await asyncio.open_unix_connection(str(self.socket_path), limit=STREAM_LIMIT)
+        try:
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        finally:
+            writer.close()
+
+        if not line:
+            raise RuntimeError("Server closed the connection without replying.")
+        response = json.loads(line)
+
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Blocking version of `request_async`."""
+        return tontine.process.run_sync(self.request_async(request))
@@ -1,5 +1,7 @@
+import asyncio
 import dataclasses
 import pathlib
+import shutil
 import sys
 import tempfile
 from typing import Optional, Tuple
@@ -7,6 +9,7 @@ from typing import Optional, Tuple
 import click
 
 import tontine.keys
+import tontine.server
 import tontine.wallet.doge
 import tontine.wallet.electrum
 
@@ -124,9 +127,17 @@ def check(ctx, require: Optional[float]):
 @click.argument("public_keys", type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), nargs=-1)
 @click.option("--gpg", type=str, default="gpg",
               help="Optional path to gpg executable.")
-def encrypt(ctx, public_keys: Tuple[pathlib.Path], gpg: str):
+@click.option("--chunk-size", type=click.IntRange(min=1), default=None,
+              help="Write a binary chunked ciphertext with chunks of this many bytes, which can be decrypted in "
+                   "parallel. Useful for large wallets.")
+@click.option("--workers", type=click.IntRange(min=1), default=None,
+              help="Number of chunks to encrypt at once. Defaults to the number of CPUs.")
+def encrypt(ctx, public_keys: Tuple[pathlib.Path], gpg: str, chunk_size: Optional[int], workers: Optional[int]):
     """
     Encrypt wallet and write the results to standard output.
+
+    The wallet is encrypted with each of the PUBLIC_KEYS in the order they are given, so the last key forms the
+    outermost layer of encryption.
     """
     if len(public_keys) < 2:
         raise click.ClickException("At least 2 public keys required.")
@@ -140,16 +151,24 @@ def encrypt(ctx, public_keys: Tuple[pathlib.Path], gpg: str):
         ciphertext_path = pathlib.Path(ciphertext.name)
 
         keyring = tontine.keys.Keyring(keyring_path, gpg)
+        key_fingerprints = []
         for key in public_keys:
-            keyring.import_key(key)
-
-        key_fingerprints = [k.fingerprint for k in keyring.list_public_keys()]
+            key_fingerprints += keyring.import_key(key)
+        if len(set(key_fingerprints)) != len(key_fingerprints):
+            raise click.ClickException("Each public key may only be used once.")
 
         ctx.obj.wallet.dump_wallet(wallet_path)
-        keyring.chain_encrypt(wallet_path, key_fingerprints, ciphertext_path)
 
-        ciphertext.seek(0)
-        print(ciphertext.read())
+        if chunk_size is None:
+            keyring.chain_encrypt(wallet_path, key_fingerprints, ciphertext_path)
+
+            ciphertext.seek(0)
+            print(ciphertext.read())
+        else:
+            keyring.chunked_encrypt(wallet_path, key_fingerprints, ciphertext_path, chunk_size, workers)
+
+            with ciphertext_path.open("rb") as ciphertext_in:
+                shutil.copyfileobj(ciphertext_in, sys.stdout.buffer)
 
 
 @click.command()
@@ -158,10 +177,16 @@ def encrypt(ctx, public_keys: Tuple[pathlib.Path], gpg: str):
 @click.argument("private_keys", type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path), nargs=-1)
 @click.option("--gpg", type=str, default="gpg",
               help="Optional path to gpg executable.")
-def exercise(ctx, ciphertext: pathlib.Path, private_keys: Tuple[pathlib.Path], gpg: str):
+@click.option("--workers", type=click.IntRange(min=1), default=None,
+              help="Number of chunks of a chunked ciphertext to decrypt at once. Defaults to the number of CPUs.")
+def exercise(ctx, ciphertext: pathlib.Path, private_keys: Tuple[pathlib.Path], gpg: str, workers: Optional[int]):
     """
     Chain-decrypt a wallet using the private keys of each investor.
 
+    Both ordinary and chunked ciphertexts (see "setup encrypt --chunk-size") are accepted. The cleartext of a chunked
+    ciphertext is written exactly as it was encrypted, while that of an ordinary ciphertext has leading and trailing
+    whitespace stripped.
+
     \b
     CIPHERTEXT: File containing the encrypted wallet.
     PRIVATE_KEYS: Private key files (minimum 2).
@@ -176,8 +201,46 @@ def exercise(ctx, ciphertext: pathlib.Path, private_keys: Tuple[pathlib.Path], g
         for key in private_keys:
             keyring.import_key(key)
 
-        cleartext = keyring.chain_decrypt(ciphertext).strip()
-        sys.stdout.write(cleartext)
+        if tontine.keys.is_chunked(ciphertext):
+            with tempfile.NamedTemporaryFile() as cleartext:
+                keyring.chunked_decrypt(ciphertext, pathlib.Path(cleartext.name), workers)
+                shutil.copyfileobj(cleartext, sys.stdout.buffer)
+        else:
+            cleartext = keyring.chain_decrypt(ciphertext).strip()
+            sys.stdout.write(cleartext)
+
+
+@click.command()
+@click.pass_context
+@click.option("--socket", "socket_path", type=click.Path(dir_okay=False, path_type=pathlib.Path), required=True,
+              help="Location of the Unix socket to listen on.")
+@click.option("--workers", type=click.IntRange(min=1), default=4,
+              help="Number of jobs to run at once.")
+@click.option("--queue-size", type=click.IntRange(min=1), default=64,
+              help="Number of jobs that may wait for a worker before new jobs are rejected.")
+@click.option("--timeout", type=float, default=None,
+              help="Timeout in seconds for each gpg command.")
+@click.option("--gpg", type=str, default="gpg",
+              help="Optional path to gpg executable.")
+def serve(ctx, socket_path: pathlib.Path, workers: int, queue_size: int, timeout: Optional[float], gpg: str):
+    """
+    Run a server that accepts address, check, encrypt and exercise jobs.
+
+    The server listens on a Unix socket for newline-delimited JSON requests, for example:
+
+    \b
+        {"op": "check"}
+        {"op": "encrypt", "public_keys": ["/keys/alice.pub", "/keys/bob.pub"]}
+        {"op": "encrypt", "public_keys": [...], "chunk_size": 16777216, "output": "/keys/wallet.bin"}
+        {"op": "exercise", "ciphertext": "/keys/wallet.asc", "private_keys": ["/keys/alice", "/keys/bob"]}
+        {"op": "exercise", "ciphertext": "/keys/wallet.bin", "private_keys": [...], "output": "/keys/wallet"}
+        {"op": "metrics"}
+
+    The wallet and the keyrings used for encryption are kept between jobs.
+    """
+    server = tontine.server.Server(ctx.obj.wallet, socket_path, gpg, workers, queue_size, timeout)
+    print(f"Listening on {socket_path}", file=sys.stderr)
+    asyncio.run(server.serve_forever())
 
 
 # The commands below the two main phases "setup" and "exercise" have wallet-specific implementations but share a common
@@ -197,7 +260,7 @@ def exercise(ctx, ciphertext: pathlib.Path, private_keys: Tuple[pathlib.Path], g
 # Because commands can belong to multiple groups in this model, we need to use a verbose Click API and explicitly
 # add commands to groups, rather than using the `@x.command` decorator.
 wallet_cmds = [doge, electrum]
-wallet_subcmds = [setup, exercise]
+wallet_subcmds = [setup, exercise, serve]
 
 for wallet_cmd in wallet_cmds:
     for wallet_subcmd in wallet_subcmds:
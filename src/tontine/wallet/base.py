@@ -1,7 +1,9 @@
 import abc
 import dataclasses
 import pathlib
-from typing import List
+from typing import List, Optional
+
+import tontine.process
 
 
 @dataclasses.dataclass
@@ -12,18 +14,42 @@ class Balance:
 
 
 class Wallet(abc.ABC):
+    def __init__(self, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Initialise the wallet's process runner.
+
+        Wallets implement the `*_async` methods. The blocking methods are thin wrappers around them.
+
+        Args:
+            max_concurrency: Maximum number of wallet commands that may run at once. `None` means no limit.
+            timeout: Timeout in seconds for each wallet command. `None` means no timeout.
+        """
+        self._runner = tontine.process.ProcessRunner(max_concurrency, timeout)
+
     @abc.abstractmethod
-    def list_unspent(self) -> List[Balance]:
+    async def list_unspent_async(self) -> List[Balance]:
         pass
 
     @abc.abstractmethod
-    def dump_wallet(self, file: pathlib.Path):
+    async def dump_wallet_async(self, file: pathlib.Path):
         pass
 
     @abc.abstractmethod
-    def load_wallet(self, file: pathlib.Path):
+    async def load_wallet_async(self, file: pathlib.Path):
         pass
 
     @abc.abstractmethod
-    def receiving_address(self) -> str:
+    async def receiving_address_async(self) -> str:
         pass
+
+    def list_unspent(self) -> List[Balance]:
+        return tontine.process.run_sync(self.list_unspent_async())
+
+    def dump_wallet(self, file: pathlib.Path):
+        tontine.process.run_sync(self.dump_wallet_async(file))
+
+    def load_wallet(self, file: pathlib.Path):
+        tontine.process.run_sync(self.load_wallet_async(file))
+
+    def receiving_address(self) -> str:
+        return tontine.process.run_sync(self.receiving_address_async())
@@ -1,14 +1,20 @@
 import dataclasses
 import json
 import pathlib
-import subprocess
-from typing import Any, List
+from typing import Any, List, Optional
 
 from tontine.wallet.base import Balance, Wallet
 
 
 class DogeWallet(Wallet):
-    def __init__(self, testnet: bool = True, doge_cli: str = "dogecoin-cli"):
+    def __init__(
+            self,
+            testnet: bool = True,
+            doge_cli: str = "dogecoin-cli",
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ):
+        super().__init__(max_concurrency, timeout)
         self.testnet = testnet
         self._doge_cli = doge_cli
 
@@ -20,25 +26,25 @@ class DogeWallet(Wallet):
 
         return args
 
-    def _exec(self, *args) -> Any:
+    async def _exec_async(self, *args) -> Any:
         cmd = self.doge_cli + [str(a) for a in args]
-        p = subprocess.run(cmd, check=True, text=True, stdout=subprocess.PIPE)
-        return p.stdout
+        stdout = await self._runner.run(cmd)
+        return stdout.decode()
 
-    def list_unspent(self) -> List[Balance]:
+    async def list_unspent_async(self) -> List[Balance]:
         keys = [f.name for f in dataclasses.fields(Balance)]
 
-        result = json.loads(self._exec("listunspent", 0))
+        result = json.loads(await self._exec_async("listunspent", 0))
         return [
             Balance(**{k: unspent[k] for k in keys})
             for unspent in result
         ]
 
-    def dump_wallet(self, file: pathlib.Path):
-        self._exec("dumpwallet", file)
+    async def dump_wallet_async(self, file: pathlib.Path):
+        await self._exec_async("dumpwallet", file)
 
-    def load_wallet(self, file: pathlib.Path):
-        self._exec("importwallet", file)
+    async def load_wallet_async(self, file: pathlib.Path):
+        await self._exec_async("importwallet", file)
 
-    def receiving_address(self) -> str:
-        return self._exec("getnewaddress").strip()
+    async def receiving_address_async(self) -> str:
+        return (await self._exec_async("getnewaddress")).strip()
@@ -1,14 +1,20 @@
-import dataclasses
 import json
 import pathlib
-import subprocess
-from typing import Any, List
+from typing import Any, List, Optional
 
 from tontine.wallet.base import Balance, Wallet
 
 
 class ElectrumWallet(Wallet):
-    def __init__(self, wallet_path: pathlib.Path, testnet: bool = True, electrum_cli: str = "electrum"):
+    def __init__(
+            self,
+            wallet_path: pathlib.Path,
+            testnet: bool = True,
+            electrum_cli: str = "electrum",
+            max_concurrency: Optional[int] = None,
+            timeout: Optional[float] = None,
+    ):
+        super().__init__(max_concurrency, timeout)
         self.wallet_path = wallet_path
         self.testnet = testnet
         self._electrum_cli = electrum_cli
@@ -21,13 +27,13 @@ class ElectrumWallet(Wallet):
 
         return args
 
-    def _exec(self, *args) -> Any:
+    async def _exec_async(self, *args) -> Any:
         cmd = self._cli + [str(a) for a in args]
-        p = subprocess.run(cmd, check=True, text=True, stdout=subprocess.PIPE)
-        return p.stdout
+        stdout = await self._runner.run(cmd)
+        return stdout.decode()
 
-    def list_unspent(self) -> List[Balance]:
-        result = json.loads(self._exec("listunspent"))
+    async def list_unspent_async(self) -> List[Balance]:
+        result = json.loads(await self._exec_async("listunspent"))
         return [
             Balance(
                 address=unspent["address"],
@@ -38,19 +44,19 @@ class ElectrumWallet(Wallet):
             for unspent in result
         ]
 
-    def dump_wallet(self, file: pathlib.Path):
-        seed = self._exec("getseed")
+    async def dump_wallet_async(self, file: pathlib.Path):
+        seed = await self._exec_async("getseed")
         with file.open("w") as seed_out:
             seed_out.write(seed)
 
-    def load_wallet(self, file: pathlib.Path):
+    async def load_wallet_async(self, file: pathlib.Path):
         with file.open("r") as seed_in:
             seed = seed_in.read()
-        self._exec("restore", seed)
+        await self._exec_async("restore", seed)
 
-    def receiving_address(self) -> str:
-        address = self._exec("getunusedaddress").strip()
+    async def receiving_address_async(self) -> str:
+        address = (await self._exec_async("getunusedaddress")).strip()
         if address == "None":
-            address = self._exec("createnewaddress").strip()
+            address = (await self._exec_async("createnewaddress")).strip()
 
         return address
@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock
+import asyncio
+from unittest.mock import AsyncMock
 
 import pytest
 
@@ -9,7 +10,7 @@ import tontine.wallet.doge
 @pytest.fixture
 def noexec_wallet() -> tontine.wallet.doge.DogeWallet:
     wallet = tontine.wallet.doge.DogeWallet(testnet=True)
-    wallet._exec = MagicMock()
+    wallet._exec_async = AsyncMock()
     return wallet
 
 
@@ -40,7 +41,7 @@ def test_listunspent_parsed_correctly(noexec_wallet: tontine.wallet.doge.DogeWal
     ]
     """
 
-    noexec_wallet._exec.return_value = response
+    noexec_wallet._exec_async.return_value = response
     expected = [
         tontine.wallet.base.Balance(
             address="niJE2pgf9wb337gYCk4xFnBy9X5kSh8Qdi",
@@ -49,3 +50,12 @@ def test_listunspent_parsed_correctly(noexec_wallet: tontine.wallet.doge.DogeWal
         )
     ]
     assert noexec_wallet.list_unspent() == expected
+
+
+def test_async_and_sync_listunspent_agree(noexec_wallet: tontine.wallet.doge.DogeWallet):
+    noexec_wallet._exec_async.return_value = (
+        '[{"address": "niJE2pgf9wb337gYCk4xFnBy9X5kSh8Qdi", "amount": 1.5, "spendable": false}]'
+    )
+
+    assert asyncio.run(noexec_wallet.list_unspent_async()) == noexec_wallet.list_unspent()
+    noexec_wallet._exec_async.assert_awaited_with("listunspent", 0)
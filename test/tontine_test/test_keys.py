@@ -1,3 +1,4 @@
+import asyncio
 import pathlib
 import textwrap
 from typing import List, Tuple
@@ -113,6 +114,86 @@ def test_import_and_list(keyring: tontine.keys.Keyring):
     assert keyring.list_public_keys() == ALL_KEYS
 
 
+def test_parse_empty_list_of_keys(keyring: tontine.keys.Keyring):
+    """A keyring with no keys is parsed into an empty list."""
+    assert keyring._parse_list_keys_stdout("tru::1:1644147360:1707217913:3:1:5\n") == []
+
+
+def test_import_returns_keys_in_file(keyring: tontine.keys.Keyring):
+    """Importing a key file returns the fingerprints of the keys it contains."""
+    assert keyring.import_key(keypair("bob")[0]) == [BOB_FINGERPRINT]
+    assert keyring.import_key(keypair("alice")[0]) == [ALICE_FINGERPRINT]
+
+    # Importing an unchanged key still reports it.
+    assert keyring.import_key(keypair("bob")[0]) == [BOB_FINGERPRINT]
+
+
+def test_get_key_by_any_id(keyring: tontine.keys.Keyring):
+    """Keys can be looked up by fingerprint, key ID and subkey fingerprint or ID."""
+    keyring.import_key(keypair("alice")[0])
+
+    alice = ALL_KEYS[0]
+    for key_id in [ALICE_FINGERPRINT, ALICE_FINGERPRINT[-16:].lower(), "84896B9B40DA3CDD", *alice.subkeys.values()]:
+        assert keyring.get_key(key_id) == alice
+
+    with pytest.raises(KeyError):
+        keyring.get_key(BOB_FINGERPRINT)
+    with pytest.raises(KeyError):
+        keyring.get_key(ALICE_FINGERPRINT, secret=True)
+
+
+def test_index_is_updated_incrementally(keyring: tontine.keys.Keyring, monkeypatch):
+    """The whole keyring is listed once, after which keys imported since the last lookup are listed together."""
+    listings = []
+    list_keys = tontine.keys.AsyncKeyring._list_keys
+
+    async def spy(self, secret, fingerprints=()):
+        listings.append((secret, list(fingerprints)))
+        return await list_keys(self, secret, fingerprints)
+
+    monkeypatch.setattr(tontine.keys.AsyncKeyring, "_list_keys", spy)
+
+    keyring.import_key(keypair("alice")[0])
+    assert listings == []
+    assert keyring.list_public_keys() == ALL_KEYS[:1]
+
+    # Importing Alice's private key also changes her public key.
+    keyring.import_key(keypair("bob")[0])
+    keyring.import_key(keypair("alice")[1])
+    keyring.import_key(keypair("bob")[0])
+    assert keyring.get_key(BOB_FINGERPRINT) == ALL_KEYS[1]
+    assert keyring.list_public_keys() == ALL_KEYS
+
+    assert listings == [(False, []), (False, [BOB_FINGERPRINT, ALICE_FINGERPRINT])]
+
+
+def test_index_detects_changes_by_other_processes(tmp_path: pathlib.Path, keyring: tontine.keys.Keyring):
+    """Keys imported by another process are seen by an existing keyring."""
+    keyring.import_key(keypair("alice")[0])
+    assert keyring.list_public_keys() == ALL_KEYS[:1]
+
+    tontine.keys.Keyring(keyring.location).import_key(keypair("bob")[0])
+    assert keyring.list_public_keys() == ALL_KEYS
+    assert keyring.import_key(keypair("alice")[0]) == [ALICE_FINGERPRINT]
+
+
+def test_encrypt_rejects_repeated_key(tmp_path: pathlib.Path, keyring: tontine.keys.Keyring):
+    """Each key may only be used once in a chain."""
+    with pytest.raises(ValueError, match="only be used once"):
+        encrypt(SAMPLE_TEXT, tmp_path, keyring, [ALICE_FINGERPRINT, BOB_FINGERPRINT, ALICE_FINGERPRINT])
+
+
+def test_async_import_and_list(tmp_path: pathlib.Path):
+    """Keys can be imported concurrently into an AsyncKeyring and then listed."""
+    keyring = tontine.keys.AsyncKeyring(tmp_path / "keyring.keys", max_concurrency=1)
+
+    async def import_and_list():
+        await asyncio.gather(*[keyring.import_key(keypair(name)[0]) for name in ["alice", "bob"]])
+        return await keyring.list_public_keys()
+
+    assert sorted(asyncio.run(import_and_list()), key=lambda k: k.name) == ALL_KEYS
+
+
 def test_round_trip_valid_key(ciphertext_file: pathlib.Path, keyring: tontine.keys.Keyring):
     """File encrypted with both public keys can be decrypted."""
 
@@ -134,3 +215,93 @@ def test_cannot_decrypt_without_all_keys(ciphertext_file: pathlib.Path, keyring:
 
     with pytest.raises(Exception):
         keyring.chain_decrypt(ciphertext_file)
+
+
+@pytest.fixture
+def chunked_ciphertext_file(tmp_path: pathlib.Path, keyring: tontine.keys.Keyring) -> pathlib.Path:
+    """Encrypt `SAMPLE_TEXT` into a chunked container using Alice and Bob's public keys, in 5-byte chunks."""
+    keyring.import_key(keypair("alice")[0])
+    keyring.import_key(keypair("bob")[0])
+
+    cleartext_file = tmp_path / "cleartext.txt"
+    ciphertext_file = tmp_path / "ciphertext.bin"
+    cleartext_file.write_text(SAMPLE_TEXT)
+
+    keyring.chunked_encrypt(cleartext_file, [ALICE_FINGERPRINT, BOB_FINGERPRINT], ciphertext_file, chunk_size=5)
+
+    return ciphertext_file
+
+
+def test_chunked_round_trip(tmp_path: pathlib.Path, chunked_ciphertext_file: pathlib.Path,
+                            keyring: tontine.keys.Keyring):
+    """Chunked ciphertext encrypted with both public keys can be decrypted."""
+    keyring.import_key(keypair("alice")[1])
+    keyring.import_key(keypair("bob")[1])
+
+    assert tontine.keys.is_chunked(chunked_ciphertext_file)
+
+    keyring.chunked_decrypt(chunked_ciphertext_file, tmp_path / "decrypted.txt", workers=2)
+    assert (tmp_path / "decrypted.txt").read_text() == SAMPLE_TEXT
+
+
+def test_corrupt_chunk_is_reported(tmp_path: pathlib.Path, chunked_ciphertext_file: pathlib.Path,
+                                   keyring: tontine.keys.Keyring):
+    """A corrupt chunk is reported by its offset."""
+    keyring.import_key(keypair("alice")[1])
+    keyring.import_key(keypair("bob")[1])
+
+    # Flip a bit inside the first chunk, which starts just after the magic bytes.
+    ciphertext = bytearray(chunked_ciphertext_file.read_bytes())
+    ciphertext[len(tontine.keys.CHUNKED_MAGIC) + 20] ^= 1
+    chunked_ciphertext_file.write_bytes(ciphertext)
+
+    with pytest.raises(ValueError, match="is corrupt"):
+        keyring.chunked_decrypt(chunked_ciphertext_file, tmp_path / "decrypted.txt")
+
+
+def test_unencrypted_chunk_is_rejected(tmp_path: pathlib.Path, keyring: tontine.keys.Keyring, monkeypatch):
+    """A chunk that gpg can "decrypt" without the data key, such as a literal data packet, is rejected."""
+    keyring.import_key(keypair("alice")[0])
+    keyring.import_key(keypair("bob")[0])
+
+    symmetric = tontine.keys.AsyncKeyring._symmetric
+
+    async def forge_first_chunk(self, args, data_key, chunk, data):
+        if chunk == 0 and "--symmetric" in args:
+            return await self._runner.run(self.gpg + ["--store", "--output", "-", "-"], input=b"E" * len(data))
+        return await symmetric(self, args, data_key, chunk, data)
+
+    monkeypatch.setattr(tontine.keys.AsyncKeyring, "_symmetric", forge_first_chunk)
+    cleartext_file = tmp_path / "cleartext.txt"
+    cleartext_file.write_text(SAMPLE_TEXT)
+    keyring.chunked_encrypt(cleartext_file, [ALICE_FINGERPRINT, BOB_FINGERPRINT], tmp_path / "ciphertext.bin", 5)
+    monkeypatch.undo()
+
+    keyring.import_key(keypair("alice")[1])
+    keyring.import_key(keypair("bob")[1])
+    with pytest.raises(ValueError, match=f"Chunk 0 at offset {len(tontine.keys.CHUNKED_MAGIC)} is corrupt"):
+        keyring.chunked_decrypt(tmp_path / "ciphertext.bin", tmp_path / "decrypted.txt")
+
+
+def test_ordinary_ciphertext_is_not_chunked(tmp_path: pathlib.Path):
+    path = tmp_path / "ciphertext.txt"
+    path.write_text("-----BEGIN PGP MESSAGE-----")
+    assert not tontine.keys.is_chunked(path)
+
+
+@pytest.mark.parametrize("chunks, match", [
+    ([[20, 10]], "lists 1 chunks, but 2 are required"),
+    ([[20, 10], [0, 10]], "Chunk 1 at offset 0"),
+    ([[20, 10], [30, 100]], "Chunk 1 at offset 30"),
+])
+def test_invalid_chunked_header_is_rejected(chunks: List[List[int]], match: str):
+    header = {"data_key": "key", "chunk_size": 5, "size": 10, "chunks": chunks}
+    with pytest.raises(ValueError, match=match):
+        tontine.keys.AsyncKeyring._check_chunked_header(header, 50, pathlib.Path("wallet.bin"))
+
+
+def test_valid_chunked_header_is_accepted():
+    header = {"data_key": "key", "chunk_size": 5, "size": 10, "chunks": [[20, 10], [30, 10]]}
+    assert tontine.keys.AsyncKeyring._check_chunked_header(header, 50, pathlib.Path("wallet.bin")) == (
+        "key", 5, 10, [(20, 10), (30, 10)]
+    )
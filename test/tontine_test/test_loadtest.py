@@ -0,0 +1,51 @@
+import pathlib
+import sys
+
+import tontine.loadtest
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert tontine.loadtest.percentile(values, 50) == 50.0
+    assert tontine.loadtest.percentile(values, 99) == 99.0
+    assert tontine.loadtest.percentile([3.0], 90) == 3.0
+
+
+def test_investor_keys_are_cached(tmp_path: pathlib.Path):
+    keys = tontine.loadtest.investor_keys(tmp_path, 2)
+    mtimes = [k[0].stat().st_mtime_ns for k in keys]
+
+    assert tontine.loadtest.investor_keys(tmp_path, 2) == keys
+    assert [k[0].stat().st_mtime_ns for k in keys] == mtimes
+
+
+def test_doge_scenarios_run_without_errors(tmp_path: pathlib.Path):
+    config = tontine.loadtest.FakeWalletConfig(unspent=5, dump_size=4096)
+    summary, peak_total_rss_mb = tontine.loadtest.run(2, 2, 2, "doge", config, tmp_path / "keys")
+
+    assert list(summary) == list(tontine.loadtest.PHASES)
+    for stats in summary.values():
+        assert stats["count"] == 2
+        assert stats["errors"] == 0
+        assert stats["peak_tree_rss_mb"] > 0
+    assert peak_total_rss_mb >= max(stats["peak_tree_rss_mb"] for stats in summary.values())
+
+
+def test_tree_rss_sums_descendants():
+    rss = {1: 10, 2: 20, 3: 30, 4: 40}
+    children = {1: [2, 3], 3: [4]}
+    assert tontine.loadtest._tree_rss_kb(1, rss, children) == 100
+    assert tontine.loadtest._tree_rss_kb(3, rss, children) == 70
+
+
+def test_memory_is_unavailable_without_proc(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(tontine.loadtest, "PROC", str(tmp_path / "proc"))
+
+    with tontine.loadtest.MemorySampler() as sampler:
+        result, _ = tontine.loadtest._run_phase(sampler, "check", [sys.executable, "-c", "pass"])
+
+    assert not sampler.available
+    assert result.ok
+    assert result.peak_tree_rss_kb is None
+    assert sampler.peak_total_kb is None
+    assert tontine.loadtest.summarise([result])["check"]["peak_tree_rss_mb"] is None
@@ -0,0 +1,62 @@
+import asyncio
+import subprocess
+import time
+
+import pytest
+
+import tontine.process
+
+
+def test_run_returns_stdout():
+    runner = tontine.process.ProcessRunner()
+    assert tontine.process.run_sync(runner.run(["cat"], input=b"Hello world!")) == b"Hello world!"
+
+
+def test_failed_command_raises():
+    runner = tontine.process.ProcessRunner()
+    with pytest.raises(subprocess.CalledProcessError):
+        tontine.process.run_sync(runner.run(["false"]))
+
+
+def test_timeout_kills_process():
+    runner = tontine.process.ProcessRunner(timeout=0.1)
+
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        tontine.process.run_sync(runner.run(["sleep", "10"]))
+    assert time.monotonic() - start < 5
+
+
+def test_cancellation_kills_process(monkeypatch):
+    runner = tontine.process.ProcessRunner()
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def spy(*args, **kwargs):
+        p = await create_subprocess_exec(*args, **kwargs)
+        processes.append(p)
+        return p
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", spy)
+
+    async def cancel_sleep():
+        task = asyncio.ensure_future(runner.run(["sleep", "10"]))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_sleep())
+    assert len(processes) == 1
+    assert processes[0].returncode is not None
+
+
+def test_concurrency_limit():
+    runner = tontine.process.ProcessRunner(max_concurrency=1)
+
+    async def run_two():
+        start = time.monotonic()
+        await asyncio.gather(runner.run(["sleep", "0.2"]), runner.run(["sleep", "0.2"]))
+        return time.monotonic() - start
+
+    assert asyncio.run(run_two()) >= 0.4
@@ -0,0 +1,239 @@
+import asyncio
+import os
+import pathlib
+import signal
+from typing import List
+
+import pytest
+
+import tontine.keys
+import tontine.server
+from tontine.wallet.base import Balance, Wallet
+
+from .test_keys import keypair
+
+
+class FakeWallet(Wallet):
+    def __init__(self):
+        super().__init__()
+        self.balances = [Balance("addr1", 1.0, True), Balance("addr2", 2.5, False)]
+        self.address = "addr3"
+        self.dumps = 0
+        # Set to make `list_unspent_async` wait until the event is set.
+        self.block = None
+
+    async def list_unspent_async(self) -> List[Balance]:
+        if self.block is not None:
+            await self.block.wait()
+        return self.balances
+
+    async def dump_wallet_async(self, file: pathlib.Path):
+        self.dumps += 1
+        file.write_text("wallet\n")
+
+    async def load_wallet_async(self, file: pathlib.Path):
+        pass
+
+    async def receiving_address_async(self) -> str:
+        return self.address
+
+
+@pytest.fixture
+def socket_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path / "tontine.sock"
+
+
+def with_server(server: tontine.server.Server, coro_fn):
+    """Run `coro_fn()` while `server` is running."""
+    async def run():
+        await server.start()
+        try:
+            return await coro_fn()
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_check_and_address_over_socket(socket_path: pathlib.Path):
+    server = tontine.server.Server(FakeWallet(), socket_path)
+    client = tontine.server.Client(socket_path)
+
+    async def requests():
+        return await asyncio.gather(client.request_async({"op": "check"}), client.request_async({"op": "address"}))
+
+    check, address = with_server(server, requests)
+    assert check == {
+        "total_spendable": 1.0,
+        "balances": [
+            {"address": "addr1", "amount": 1.0, "spendable": True},
+            {"address": "addr2", "amount": 2.5, "spendable": False},
+        ],
+    }
+    assert address == {"address": "addr3"}
+    assert not socket_path.exists()
+
+
+def test_errors_are_returned_to_client(socket_path: pathlib.Path):
+    server = tontine.server.Server(FakeWallet(), socket_path)
+    client = tontine.server.Client(socket_path)
+
+    async def requests():
+        with pytest.raises(RuntimeError, match="Unknown operation"):
+            await client.request_async({"op": "nonsense"})
+        with pytest.raises(RuntimeError, match="At least 2 public keys"):
+            await client.request_async({"op": "encrypt", "public_keys": []})
+        return await client.request_async({"op": "metrics"})
+
+    metrics = with_server(server, requests)
+    assert metrics["jobs"]["encrypt"]["count"] == 1
+    assert metrics["jobs"]["encrypt"]["errors"] == 1
+
+
+def test_repeated_public_key_is_rejected_before_dumping_wallet(socket_path: pathlib.Path):
+    wallet = FakeWallet()
+    server = tontine.server.Server(wallet, socket_path)
+    client = tontine.server.Client(socket_path)
+    alice, bob = (str(keypair(name)[0]) for name in ["alice", "bob"])
+
+    async def request():
+        with pytest.raises(RuntimeError, match="may only be used once"):
+            await client.request_async({"op": "encrypt", "public_keys": [alice, alice, bob]})
+
+    with_server(server, request)
+    assert wallet.dumps == 0
+
+
+def test_encrypt_and_exercise_round_trip(tmp_path: pathlib.Path, socket_path: pathlib.Path, monkeypatch):
+    """Ordinary and chunked ciphertexts encrypted by the server can be exercised, and key files are imported once."""
+    imported = []
+    import_key = tontine.keys.AsyncKeyring.import_key
+
+    async def spy(self, key_file):
+        imported.append(key_file.name)
+        return await import_key(self, key_file)
+
+    monkeypatch.setattr(tontine.keys.AsyncKeyring, "import_key", spy)
+
+    server = tontine.server.Server(FakeWallet(), socket_path)
+    client = tontine.server.Client(socket_path)
+    public_keys = [str(keypair(name)[0]) for name in ["alice", "bob"]]
+    private_keys = [str(keypair(name)[1]) for name in ["alice", "bob"]]
+    ciphertext, chunked_ciphertext = tmp_path / "wallet.asc", tmp_path / "wallet.bin"
+
+    async def requests():
+        reply = await client.request_async({"op": "encrypt", "public_keys": public_keys})
+        ciphertext.write_text(reply["ciphertext"])
+        await client.request_async({
+            "op": "encrypt", "public_keys": public_keys, "chunk_size": 4, "output": str(chunked_ciphertext),
+        })
+
+        return await asyncio.gather(
+            client.request_async({"op": "exercise", "ciphertext": str(ciphertext), "private_keys": private_keys}),
+            client.request_async({
+                "op": "exercise", "ciphertext": str(chunked_ciphertext), "private_keys": private_keys,
+                "output": str(tmp_path / "wallet"),
+            }),
+        )
+
+    exercised, chunked_exercised = with_server(server, requests)
+    # Only the cleartext of an ordinary ciphertext is stripped.
+    assert exercised == {"cleartext": "wallet"}
+    assert chunked_exercised == {"output": str(tmp_path / "wallet")}
+    assert (tmp_path / "wallet").read_text() == "wallet\n"
+    # Public key files are imported into the server's keyring once; each exercise imports into its own keyring.
+    assert imported[:2] == ["alice.pub", "bob.pub"]
+    assert sorted(imported[2:]) == ["alice", "alice", "bob", "bob"]
+
+
+def test_full_queue_rejects_jobs(socket_path: pathlib.Path):
+    wallet = FakeWallet()
+    server = tontine.server.Server(wallet, socket_path, workers=1, queue_size=1)
+
+    async def requests():
+        wallet.block = asyncio.Event()
+
+        # The first job occupies the only worker and the second fills the queue.
+        running = asyncio.ensure_future(server.submit({"op": "check"}))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(server.submit({"op": "check"}))
+        await asyncio.sleep(0.01)
+
+        metrics = server.metrics()
+        with pytest.raises(RuntimeError, match="queue is full"):
+            await server.submit({"op": "check"})
+
+        wallet.block.set()
+        await asyncio.gather(running, queued)
+        return metrics, server.metrics()
+
+    during, after = with_server(server, requests)
+    assert during["queue_depth"] == 1
+    assert during["in_flight"] == 1
+    assert after["queue_depth"] == 0
+    assert after["rejected"] == 1
+    assert after["jobs"]["check"]["count"] == 2
+
+
+def test_large_reply(socket_path: pathlib.Path):
+    """Replies larger than the default asyncio line limit of 64 KiB are received."""
+    wallet = FakeWallet()
+    wallet.address = "x" * 200_000
+    server = tontine.server.Server(wallet, socket_path)
+    client = tontine.server.Client(socket_path)
+
+    assert with_server(server, lambda: client.request_async({"op": "address"})) == {"address": wallet.address}
+
+
+def test_oversized_request_is_rejected(socket_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(tontine.server, "STREAM_LIMIT", 1024)
+    server = tontine.server.Server(FakeWallet(), socket_path)
+    client = tontine.server.Client(socket_path)
+
+    async def requests():
+        with pytest.raises(RuntimeError, match="longer than the limit"):
+            await client.request_async({"op": "check", "padding": "x" * 2048})
+        return await client.request_async({"op": "address"})
+
+    assert with_server(server, requests) == {"address": "addr3"}
+
+
+def test_close_with_idle_connection_and_queued_jobs(socket_path: pathlib.Path):
+    """Closing the server does not wait for idle clients, and fails running and queued jobs."""
+    wallet = FakeWallet()
+    wallet.block = asyncio.Event()
+    server = tontine.server.Server(wallet, socket_path, workers=1)
+
+    async def run():
+        await server.start()
+        _, idle_writer = await asyncio.open_unix_connection(str(socket_path))
+
+        running = asyncio.ensure_future(server.submit({"op": "check"}))
+        queued = asyncio.ensure_future(server.submit({"op": "check"}))
+        await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(server.close(), 3)
+        idle_writer.close()
+        return await asyncio.gather(running, queued, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [str(r) for r in results] == ["Server is shutting down."] * 2
+    assert not socket_path.exists()
+
+
+def test_sigterm_cleans_up(socket_path: pathlib.Path):
+    server = tontine.server.Server(FakeWallet(), socket_path)
+    keyring_dirs = []
+
+    async def run():
+        serving = asyncio.ensure_future(server.serve_forever())
+        while not socket_path.exists():
+            await asyncio.sleep(0.01)
+        keyring_dirs.append(pathlib.Path(server._keyring_dir.name))
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(serving, 3)
+
+    asyncio.run(run())
+    assert not socket_path.exists()
+    assert not keyring_dirs[0].exists()